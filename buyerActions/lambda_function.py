@@ -1,9 +1,19 @@
 import os
-import json
+import time
+import functools
+import contextlib
+import datetime
+import gzip
+import base64
+from concurrent.futures import ThreadPoolExecutor
 import boto3
-from typing import Optional, Dict, Any, List
-from pydantic import BaseModel, Field, ValidationError
-from sqlalchemy import create_engine, Column, Integer, String, JSON, Enum, Index, func, select, Boolean, Date, ForeignKey
+import orjson
+from botocore.signers import CloudFrontSigner
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding
+from typing import Annotated, Optional, Dict, Any, List, Union
+import msgspec
+from sqlalchemy import create_engine, Column, Integer, String, JSON, Enum, Index, func, select, bindparam, text, Boolean, Date, ForeignKey
 from sqlalchemy.orm import declarative_base, sessionmaker
 from sqlalchemy.dialects.mysql import TIMESTAMP
 
@@ -13,30 +23,103 @@ Base = declarative_base()
 # Database Config - Fetched from Environment Variables
 # DB_USER = os.environ.get("DB_USER")
 # DB_PASS = os.environ.get("DB_PASS")
-# DB_HOST = os.environ.get("DB_HOST")
+# DB_HOST = os.environ.get("DB_HOST")  # RDS Proxy endpoint, not the instance
 # DB_NAME = os.environ.get("DB_NAME")
+# RDS CA bundle shipped at the root of the shared layer (extracted to /opt)
+DB_SSL_CA = os.environ.get("DB_SSL_CA", "/opt/global-bundle.pem")
 
 DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASS}@{DB_HOST}/{DB_NAME}"
 
-# Engine with connection pooling best practices
+# Engine with connection pooling best practices; RDS Proxy does the real pooling and
+# multiplexing, so each container only needs a couple of TLS connections to it
 engine = create_engine(
     DATABASE_URL, 
     pool_recycle=3600, 
     pool_pre_ping=True, 
-    pool_size=10, 
-    max_overflow=2
+    pool_size=2, 
+    max_overflow=0,
+    query_cache_size=1200,
+    connect_args={"connect_timeout": 2, "ssl": {"ca": DB_SSL_CA}}
 )
 SessionLocal = sessionmaker(bind=engine)
+# Lambda runs one invocation at a time, so a single Session serves every write request
+SESSION = SessionLocal()
+
+class LazyConnection:
+    """Core connection for read routes, checked out from the pool on the first execute().
+
+    Requests rejected before querying (e.g. invalid query strings) never touch the pool or the DB.
+    """
+    def __init__(self):
+        self._conn = None
+
+    def execute(self, *args, **kwargs):
+        if self._conn is None:
+            self._conn = engine.connect()
+        return self._conn.execute(*args, **kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._conn is not None:
+            self._conn.close()
+
+@contextlib.contextmanager
+def session_scope():
+    """One transaction per request on SESSION: commits on success, rolls back on error."""
+    with SESSION.begin():
+        yield SESSION
+
+def warm_connection_pool():
+    """Opens a pooled connection during Lambda INIT so the first request skips the TCP/TLS/auth handshake."""
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except Exception as e:
+        # Never fail INIT; the first request will connect lazily instead
+        print(f"Connection pool warm-up failed: {e}")
+
+warm_connection_pool()
 
 # AWS Clients initialized once
 s3_client = boto3.client("s3")
+# Shared pool for bulk URL signing; the client is thread-safe
+signer_pool = ThreadPoolExecutor(max_workers=8)
 BUCKET_NAME = "valuesmart"
 
+# CloudFront distribution in front of BUCKET_NAME; access is granted by signed cookies.
+# The cookies are set by the API's /sign_cookie response, so COOKIE_DOMAIN must be a parent
+# domain shared by the API host and CDN_HOST (e.g. "example.com" for api./assets.example.com).
+CDN_HOST = os.environ.get("CDN_HOST")
+COOKIE_DOMAIN = os.environ.get("COOKIE_DOMAIN")
+if not CDN_HOST or not COOKIE_DOMAIN:
+    raise RuntimeError("CDN_HOST and COOKIE_DOMAIN must both be set")
+if not ("." + CDN_HOST).endswith("." + COOKIE_DOMAIN.lstrip(".")):
+    raise RuntimeError(f"COOKIE_DOMAIN {COOKIE_DOMAIN!r} is not a parent domain of CDN_HOST {CDN_HOST!r}")
+# S3 key prefix holding the catalog images (market segment and equipment images), e.g.
+# "catalog/". Signed cookies only grant this prefix, not the whole distribution; CloudFront
+# allows a single statement per cookie policy, so all catalog keys must share it.
+CDN_COOKIE_PREFIX = os.environ.get("CDN_COOKIE_PREFIX", "").strip("/")
+if not CDN_COOKIE_PREFIX or "*" in CDN_COOKIE_PREFIX or "?" in CDN_COOKIE_PREFIX:
+    raise RuntimeError("CDN_COOKIE_PREFIX must be set to the catalog image key prefix (no wildcards)")
+# Frontend origins allowed to fetch /sign_cookie with credentials (comma-separated)
+CORS_ALLOWED_ORIGINS = frozenset(
+    origin.strip() for origin in os.environ.get("CORS_ALLOWED_ORIGINS", "").split(",") if origin.strip()
+)
+CLOUDFRONT_KEY_PAIR_ID = os.environ.get("CLOUDFRONT_KEY_PAIR_ID")
+CLOUDFRONT_PRIVATE_KEY = os.environ.get("CLOUDFRONT_PRIVATE_KEY")
+# Matches the 300s lifetime of the presigned URLs the catalog returned before CloudFront
+CDN_COOKIE_TTL = int(os.environ.get("CDN_COOKIE_TTL", "300"))
+
 # --- 2. ORM MODELS ---
 
 class EquipmentCapabilitiesFct(Base):
     __tablename__ = "equipment_capabilities_fct"
-    __table_args__ = {"schema": "valuesmart"}
+    __table_args__ = (
+        Index('ix_ecf_div_ms', 'division_id', 'market_segment_id'),
+        {"schema": "valuesmart"}
+    )
     id = Column(Integer, primary_key=True, autoincrement=True)
     unit_operation_id = Column(Integer)
     unit_operation = Column(String(50))
@@ -73,16 +156,16 @@ class BuyerEnquiredEquipment(Base):
     e_registered_details = Column(JSON, nullable=True)
     archive = Column(Enum('Y', 'N'), server_default='N')
 
-# --- 3. PYDANTIC SCHEMAS (Validation Layer) ---
+# --- 3. MSGSPEC SCHEMAS (Validation Layer) ---
 
-class GetUnitOpSchema(BaseModel):
+class GetUnitOpSchema(msgspec.Struct):
     divisionId: int
     marketSegmentId: int
 
 class GetEquipSchema(GetUnitOpSchema):
     unitOperationId: int
 
-class PostEnquirySchema(BaseModel):
+class PostEnquirySchema(msgspec.Struct):
     buyer_id: int
     market_segment_id: int
     unit_operation_id: int
@@ -90,126 +173,286 @@ class PostEnquirySchema(BaseModel):
     capacity_id: Optional[int] = None
     e_registered_details: Optional[Dict[str, Any]] = None
 
+class BulkPostEnquirySchema(msgspec.Struct):
+    items: Annotated[List[PostEnquirySchema], msgspec.Meta(min_length=1)]
+
 # --- 4. UTILITIES ---
 
-def send_response(status_code: int, body: Any):
-    return {
+def request_body(event) -> Union[str, bytes]:
+    """Raw request body for msgspec to decode and validate in one pass; unwraps API Gateway's base64 bodies."""
+    body = event.get("body") or "{}"
+    if event.get("isBase64Encoded"):
+        return base64.b64decode(body, validate=True)
+    # msgspec decodes str input directly, so no .encode() copy
+    return body
+
+def request_header(event, name: str) -> Optional[str]:
+    """Case-insensitive lookup; API Gateway passes header names through as the client sent them."""
+    name = name.lower()
+    for key, value in (event.get("headers") or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+def send_response(status_code: int, body: Any, multi_value_headers: Optional[Dict[str, List[str]]] = None,
+                  headers: Optional[Dict[str, str]] = None):
+    return send_raw_response(status_code, orjson.dumps(body, default=str).decode('utf-8'), multi_value_headers, headers)
+
+def send_raw_response(status_code: int, body: str, multi_value_headers: Optional[Dict[str, List[str]]] = None,
+                      headers: Optional[Dict[str, str]] = None):
+    """Like send_response, for a body that is already serialized JSON. ``headers`` override the defaults."""
+    response = {
         'statusCode': status_code,
         'headers': {
             "Access-Control-Allow-Origin": "*",
-            "Content-Type": "application/json"
+            "Content-Type": "application/json",
+            **(headers or {})
         },
-        'body': json.dumps(body)
+        'body': body
     }
+    if multi_value_headers:
+        response['multiValueHeaders'] = multi_value_headers
+    return response
+
+# Bodies above this size are gzipped for clients that accept it
+GZIP_MIN_BYTES = 4096
+
+def accepts_gzip(event) -> bool:
+    return "gzip" in (request_header(event, "accept-encoding") or "").lower()
+
+def compress_response(event, response):
+    """Gzips large bodies; API Gateway turns the base64 body back into binary (binaryMediaTypes */*)."""
+    if len(response['body']) <= GZIP_MIN_BYTES or not accepts_gzip(event):
+        return response
+    compressed = gzip.compress(response['body'].encode('utf-8'), compresslevel=1)
+    response['headers']["Content-Encoding"] = "gzip"
+    response['headers']["Vary"] = ", ".join(filter(None, (response['headers'].get("Vary"), "Accept-Encoding")))
+    response['body'] = base64.b64encode(compressed).decode('ascii')
+    response['isBase64Encoded'] = True
+    return response
+
+@functools.lru_cache(maxsize=4096)
+def _presign_s3_url(object_key: str, expires: int, bucket: str, epoch_half: int):
+    # epoch_half only varies the cache key; a URL is reused for at most half its lifetime
+    return s3_client.generate_presigned_url(
+        'get_object', Params={'Bucket': bucket, 'Key': object_key}, ExpiresIn=expires
+    )
 
 def get_s3_url(object_key: str, expires: int = 300):
     if not object_key: return None
-    return s3_client.generate_presigned_url(
-        'get_object', Params={'Bucket': BUCKET_NAME, 'Key': object_key}, ExpiresIn=expires
+    epoch_half = int(time.time()) // max(expires // 2, 1)
+    return _presign_s3_url(object_key, expires, BUCKET_NAME, epoch_half)
+
+# Key characters percent-encoded in CDN URLs, as generate_presigned_url did; "%" must come first.
+# Other key characters are either URL-safe in a path or encoded by the client.
+_URL_PATH_ESCAPES = (
+    ("%", "%25"), (" ", "%20"), ("#", "%23"), ("?", "%3F"), ("+", "%2B"), ('"', "%22"),
+    ("<", "%3C"), (">", "%3E"), ("\\", "%5C"), ("^", "%5E"), ("`", "%60"), ("{", "%7B"),
+    ("|", "%7C"), ("}", "%7D")
+)
+
+def cdn_url_expr(object_key_column):
+    # NULL/empty keys stay NULL, matching get_s3_url returning None
+    key = func.nullif(object_key_column, "")
+    for char, escaped in _URL_PATH_ESCAPES:
+        key = func.replace(key, char, escaped)
+    return func.concat(f"https://{CDN_HOST}/", key)
+
+def json_response_select(stmt, url_columns: Optional[Dict[str, str]] = None):
+    """Wraps ``stmt`` so MySQL renders the whole ``{"response": [...]}`` body as a single JSON string.
+
+    ``url_columns`` maps extra output keys to the object-key column they are built from.
+    """
+    rows = stmt.subquery()
+    pairs = []
+    for column in rows.c:
+        pairs += [column.key, column]
+    for name, source in (url_columns or {}).items():
+        pairs += [name, cdn_url_expr(rows.c[source])]
+    return select(func.json_object(
+        "response", func.coalesce(func.json_arrayagg(func.json_object(*pairs)), func.json_array())
+    ))
+
+@functools.lru_cache(maxsize=1)
+def _cloudfront_signer():
+    private_key = serialization.load_pem_private_key(CLOUDFRONT_PRIVATE_KEY.encode("utf-8"), password=None)
+    return CloudFrontSigner(
+        CLOUDFRONT_KEY_PAIR_ID, lambda message: private_key.sign(message, padding.PKCS1v15(), hashes.SHA1())
     )
 
+def _cloudfront_b64(data: bytes) -> str:
+    # CloudFront's URL-safe base64 variant
+    return base64.b64encode(data).decode("utf-8").replace("+", "-").replace("=", "_").replace("/", "~")
+
 # --- 5. ACTION HANDLERS ---
 
-def get_div_mktseg_cache(event, session):
+# Catalog statements are built once per container; request values arrive as bind parameters
+# so every invocation hits the same compiled-SQL cache entry. Rows are deduplicated with
+# GROUP BY on their natural keys (served by ix_ecf_div_ms) rather than a DISTINCT over every
+# projected column; the descriptive columns are fixed per key, hence ANY_VALUE().
+_STMT_DIV_MKTSEG = json_response_select(
+    select(
+        EquipmentCapabilitiesFct.division_id,
+        func.any_value(EquipmentCapabilitiesFct.division_name).label("division_name"),
+        EquipmentCapabilitiesFct.market_segment_id,
+        func.any_value(EquipmentCapabilitiesFct.market_segment_name).label("market_segment_name"),
+        func.any_value(MarketSegment.image_url).label("image_url")
+    ).join(MarketSegment, EquipmentCapabilitiesFct.market_segment_id == MarketSegment.id).group_by(
+        EquipmentCapabilitiesFct.division_id,
+        EquipmentCapabilitiesFct.market_segment_id
+    ),
+    url_columns={"imageUrl": "image_url"}
+)
+
+_STMT_DIV_MKTSEG_UNITOP = json_response_select(
+    select(
+        EquipmentCapabilitiesFct.division_id,
+        func.any_value(EquipmentCapabilitiesFct.division_name).label("division_name"),
+        EquipmentCapabilitiesFct.unit_operation_id,
+        func.any_value(EquipmentCapabilitiesFct.unit_operation).label("unit_operation")
+    ).where(
+        EquipmentCapabilitiesFct.division_id == bindparam("div"),
+        EquipmentCapabilitiesFct.market_segment_id == bindparam("ms")
+    ).group_by(
+        EquipmentCapabilitiesFct.division_id,
+        EquipmentCapabilitiesFct.unit_operation_id
+    )
+)
+
+_STMT_DIV_MKTSEG_UNITOP_EQUIP = json_response_select(
+    select(
+        EquipmentCapabilitiesFct.division_id,
+        func.any_value(EquipmentDetails.machine_name).label("machine_name"),
+        EquipmentDetails.id,
+        func.any_value(EquipmentDetails.machine_image_url).label("machine_image_url")
+    ).join(EquipmentDetails, EquipmentDetails.id == EquipmentCapabilitiesFct.id).where(
+        EquipmentCapabilitiesFct.division_id == bindparam("div"),
+        EquipmentCapabilitiesFct.market_segment_id == bindparam("ms"),
+        EquipmentCapabilitiesFct.unit_operation_id == bindparam("uo")
+    ).group_by(
+        EquipmentCapabilitiesFct.division_id,
+        EquipmentDetails.id
+    ),
+    url_columns={"machineImageUrl": "machine_image_url"}
+)
+
+def get_sign_cookie(event, conn):
+    """Signs one policy for the catalog image prefix on the CDN so asset URLs need no per-row signature.
+
+    Unauthenticated by design: like the catalog routes it serves, it only exposes catalog images.
+    """
+    origin = request_header(event, "origin")
+    if origin is not None and origin not in CORS_ALLOWED_ORIGINS:
+        return send_response(403, {"error": "Origin not allowed"})
+    # A credentialed cross-origin fetch only stores the cookies with an exact origin echo
+    cors_headers = {
+        "Access-Control-Allow-Origin": origin,
+        "Access-Control-Allow-Credentials": "true",
+        "Vary": "Origin"
+    } if origin else {}
+    signer = _cloudfront_signer()
+    expires_at = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=CDN_COOKIE_TTL)
+    policy = signer.build_policy(f"https://{CDN_HOST}/{CDN_COOKIE_PREFIX}/*", expires_at).encode("utf-8")
+    cookies = {
+        "CloudFront-Policy": _cloudfront_b64(policy),
+        "CloudFront-Signature": _cloudfront_b64(signer.rsa_signer(policy)),
+        "CloudFront-Key-Pair-Id": CLOUDFRONT_KEY_PAIR_ID,
+    }
+    set_cookie = [
+        f"{name}={value}; Domain={COOKIE_DOMAIN}; Path=/{CDN_COOKIE_PREFIX}/; Max-Age={CDN_COOKIE_TTL}; Secure; HttpOnly; SameSite=None"
+        for name, value in cookies.items()
+    ]
+    return send_response(
+        200, {"expires": expires_at}, multi_value_headers={"Set-Cookie": set_cookie}, headers=cors_headers
+    )
+
+def get_div_mktseg_cache(event, conn):
     try:
         S3_KEY = "division_marketsegment.json"
         response = s3_client.get_object(Bucket=BUCKET_NAME, Key=S3_KEY)
-        data = json.loads(response["Body"].read().decode("utf-8"))
-        for division in data:
-            for ms in division.get("marketSegments", []):
-                if ms.get("imageUrl"):
-                    ms["imageUrl"] = get_s3_url(ms["imageUrl"], expires=60)
-        return send_response(200, {"response": data})
+        # orjson parses the raw bytes directly (no .decode() copy) and is faster than streaming parsers
+        divisions = orjson.loads(response["Body"].read())
+        segments = [ms for division in divisions for ms in division.get("marketSegments", []) if ms.get("imageUrl")]
+        keys = list(dict.fromkeys(ms["imageUrl"] for ms in segments))
+        signed = dict(zip(keys, signer_pool.map(lambda key: get_s3_url(key, expires=60), keys)))
+        for ms in segments:
+            ms["imageUrl"] = signed[ms["imageUrl"]]
+        return send_raw_response(200, orjson.dumps({"response": divisions}).decode("utf-8"))
     except Exception as e:
         return send_response(404, {"error": "Cache not found or invalid"})
 
-def get_div_mktseg(event, session):
-    stmt = select(
-        EquipmentCapabilitiesFct.division_id,
-        EquipmentCapabilitiesFct.division_name,
-        EquipmentCapabilitiesFct.market_segment_id,
-        EquipmentCapabilitiesFct.market_segment_name,
-        MarketSegment.image_url
-    ).join(MarketSegment, EquipmentCapabilitiesFct.market_segment_id == MarketSegment.id).distinct()
-    
-    records = session.execute(stmt).mappings().all()
-    results = [{**dict(r), "imageUrl": get_s3_url(r.image_url)} for r in records]
-    return send_response(200, {"response": results})
-
-def get_div_mktseg_unitop(event, session):
+def get_div_mktseg(event, conn):
+    return send_raw_response(200, conn.execute(_STMT_DIV_MKTSEG).scalar())
+
+def get_div_mktseg_unitop(event, conn):
     try:
-        params = GetUnitOpSchema(**(event.get("queryStringParameters") or {}))
-        stmt = select(
-            EquipmentCapabilitiesFct.division_id,
-            EquipmentCapabilitiesFct.division_name,
-            EquipmentCapabilitiesFct.unit_operation_id,
-            EquipmentCapabilitiesFct.unit_operation
-        ).where(
-            EquipmentCapabilitiesFct.division_id == params.divisionId,
-            EquipmentCapabilitiesFct.market_segment_id == params.marketSegmentId
-        ).distinct()
-        
-        records = session.execute(stmt).mappings().all()
-        return send_response(200, {"response": [dict(r) for r in records]})
-    except ValidationError as e:
-        return send_response(400, {"error": e.errors()})
-
-def get_div_mktseg_unitop_equip(event, session):
+        # strict=False: query-string values arrive as strings and are coerced like before
+        params = msgspec.convert(event.get("queryStringParameters") or {}, type=GetUnitOpSchema, strict=False)
+        result = conn.execute(_STMT_DIV_MKTSEG_UNITOP, {"div": params.divisionId, "ms": params.marketSegmentId})
+        return send_raw_response(200, result.scalar())
+    except msgspec.ValidationError as e:
+        return send_response(400, {"error": str(e)})
+
+def get_div_mktseg_unitop_equip(event, conn):
     try:
-        params = GetEquipSchema(**(event.get("queryStringParameters") or {}))
-        stmt = select(
-            EquipmentCapabilitiesFct.division_id,
-            EquipmentDetails.machine_name,
-            EquipmentDetails.id,
-            EquipmentDetails.machine_image_url
-        ).join(EquipmentDetails, EquipmentDetails.id == EquipmentCapabilitiesFct.id).where(
-            EquipmentCapabilitiesFct.division_id == params.divisionId,
-            EquipmentCapabilitiesFct.market_segment_id == params.marketSegmentId,
-            EquipmentCapabilitiesFct.unit_operation_id == params.unitOperationId
-        ).distinct()
-        
-        records = session.execute(stmt).mappings().all()
-        results = [{**dict(r), "machineImageUrl": get_s3_url(r.machine_image_url)} for r in records]
-        return send_response(200, {"response": results})
-    except ValidationError as e:
-        return send_response(400, {"error": e.errors()})
+        params = msgspec.convert(event.get("queryStringParameters") or {}, type=GetEquipSchema, strict=False)
+        result = conn.execute(_STMT_DIV_MKTSEG_UNITOP_EQUIP, {
+            "div": params.divisionId, "ms": params.marketSegmentId, "uo": params.unitOperationId
+        })
+        return send_raw_response(200, result.scalar())
+    except msgspec.ValidationError as e:
+        return send_response(400, {"error": str(e)})
 
 def post_buyer_enquiry(event, session):
     try:
-        body = json.loads(event.get("body", "{}"))
-        data = PostEnquirySchema(**body)
-        new_record = BuyerEnquiredEquipment(**data.model_dump())
+        # strict=False keeps pydantic's lax coercion ("1", 1.0 -> 1), same as the query-string schemas
+        data = msgspec.json.decode(request_body(event), type=PostEnquirySchema, strict=False)
+        new_record = BuyerEnquiredEquipment(**msgspec.structs.asdict(data))
         session.add(new_record)
-        session.commit()
+        session.flush()  # assigns new_record.id; session_scope commits
         return send_response(201, {"message": "Enquiry submitted", "id": new_record.id})
-    except (ValidationError, json.JSONDecodeError) as e:
+    except (msgspec.DecodeError, ValueError) as e:  # DecodeError covers ValidationError; ValueError is bad base64
+        return send_response(400, {"error": "Invalid Input"})
+
+def post_buyer_enquiries_bulk(event, session):
+    try:
+        data = msgspec.json.decode(request_body(event), type=BulkPostEnquirySchema, strict=False)
+        # One executemany INSERT, committed once by session_scope
+        session.execute(
+            BuyerEnquiredEquipment.__table__.insert(),
+            [msgspec.structs.asdict(item) for item in data.items]
+        )
+        return send_response(201, {"message": "Enquiries submitted", "count": len(data.items)})
+    except (msgspec.DecodeError, ValueError) as e:  # DecodeError covers ValidationError; ValueError is bad base64
         return send_response(400, {"error": "Invalid Input"})
 
 # --- 6. MAIN ROUTER ---
 
-def lambda_handler(event, context):
-    method = event.get("httpMethod", "").lower()
-    path = event.get("path", "").strip("/").replace("/", "_")
-    action_key = f"{method}_{path}"
-    
-    actions = {
-        "get_div_mktseg": get_div_mktseg,
-        "get_div_mktseg_unitop": get_div_mktseg_unitop,
-        "get_div_mktseg_unitop_equip": get_div_mktseg_unitop_equip,
-        "get_div_mktseg_cache": get_div_mktseg_cache,
-        "post_buyer_enquiry": post_buyer_enquiry
-    }
+# Built once per container; keyed on API Gateway's raw (httpMethod, path).
+# Each route names the context that supplies its database handle: a lazily opened Core
+# connection for reads, a transaction on SESSION for writes, or nothing for routes that never
+# touch the database.
+ROUTES = {
+    ("GET", "/div_mktseg"): (get_div_mktseg, LazyConnection),
+    ("GET", "/div_mktseg_unitop"): (get_div_mktseg_unitop, LazyConnection),
+    ("GET", "/div_mktseg_unitop_equip"): (get_div_mktseg_unitop_equip, LazyConnection),
+    ("GET", "/div_mktseg_cache"): (get_div_mktseg_cache, contextlib.nullcontext),
+    ("GET", "/sign_cookie"): (get_sign_cookie, contextlib.nullcontext),
+    ("POST", "/buyer_enquiry"): (post_buyer_enquiry, session_scope),
+    ("POST", "/buyer_enquiries_bulk"): (post_buyer_enquiries_bulk, session_scope)
+}
 
-    handler = actions.get(action_key)
-    if not handler:
+def lambda_handler(event, context):
+    route = ROUTES.get((event.get("httpMethod"), event.get("path")))
+    if not route:
         return send_response(404, {"error": "Route not found"})
 
-    session = SessionLocal()
+    handler, open_db = route
     try:
-        return handler(event, session)
+        # Leaving the context closes the connection or ends the transaction (rolling back on error)
+        with open_db() as db:
+            response = handler(event, db)
+        return compress_response(event, response)
     except Exception as e:
-        session.rollback()
         print(f"Internal Error: {e}")
         return send_response(500, {"error": "Internal Server Error"})
-    finally:
-        session.close()
\ No newline at end of file
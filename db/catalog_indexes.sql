@@ -0,0 +1,7 @@
+-- Index behind the catalog GROUP BY queries in buyerActions/lambda_function.py
+-- (declared on EquipmentCapabilitiesFct as ix_ecf_div_ms). Lets MySQL group
+-- equipment_capabilities_fct on its natural keys in index order, and serves the
+-- division/market-segment filter of the unit-operation endpoints, instead of a
+-- filesort/temporary table for DISTINCT.
+
+CREATE INDEX ix_ecf_div_ms ON valuesmart.equipment_capabilities_fct (division_id, market_segment_id);
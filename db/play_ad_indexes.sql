@@ -0,0 +1,9 @@
+-- Covering indexes for playAd's slot lookup (PLAY_AD_SQL in playAd/lambda_function.py).
+-- calendar_time_rates is resolved by (booking_date, hour) and yields id for the join;
+-- slot_booking_request is probed by (booking_date_id, approval_status) and returns url
+-- from the index itself, so LIMIT 1 stops at the first index entry without a row lookup.
+-- url must be a VARCHAR short enough for an InnoDB key (<= 3072 bytes).
+
+CREATE INDEX ix_ctr_date_hour ON valuesmart.calendar_time_rates (booking_date, hour, id);
+
+CREATE INDEX ix_sbr_booking_approval ON valuesmart.slot_booking_request (booking_date_id, approval_status, url);
@@ -1,52 +1,51 @@
 import os
 import json
 import logging
+import time
 import datetime
 import boto3
-from botocore.exceptions import ClientError
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.exc import SQLAlchemyError
-
-# Import your models
-from models import SlotBookingRequest, CalendarTimeRates
+import orjson
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
 
 # Configure Logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 # --- Configuration & Global Initializations ---
-# DB_USER = os.environ.get("DB_USER")
-# DB_PASS = os.environ.get("DB_PASS")
-# DB_HOST = os.environ.get("DB_HOST")
-# DB_NAME = os.environ.get("DB_NAME")
-# BUCKET_NAME = os.environ.get("BUCKET_NAME", "valuesmart-assets")
-
-
-
-
-# Global engine and session factory to leverage Lambda warm starts
-_engine = None
-_SessionLocal = None
+# Aurora is queried over the RDS Data API, so no MySQL connection is held by this Lambda
+DB_CLUSTER_ARN = os.environ.get("DB_CLUSTER_ARN")
+DB_SECRET_ARN = os.environ.get("DB_SECRET_ARN")
+DB_NAME = os.environ.get("DB_NAME", "valuesmart")
+BUCKET_NAME = os.environ.get("BUCKET_NAME", "valuesmart-assets")
+
+PLAY_AD_SQL = (
+    "SELECT sbr.url FROM slot_booking_request sbr "
+    "JOIN calendar_time_rates ctr ON sbr.booking_date_id = ctr.id "
+    "WHERE ctr.booking_date = :booking_date AND ctr.hour = :hour "
+    "AND sbr.approval_status = 'approved' LIMIT 1"
+)
+
+# Global clients to leverage Lambda warm starts
 s3_client = boto3.client('s3')
-
-def get_session():
-    """Initializes the engine once and returns a new session."""
-    global _engine, _SessionLocal
-    if _SessionLocal is None:
-        try:
-            connection_uri = f"mysql+pymysql://{DB_USER}:{DB_PASS}@{DB_HOST}/{DB_NAME}"
-            _engine = create_engine(
-                connection_uri,
-                pool_recycle=300,  # AWS RDS often kills idle connections after 5 mins
-                pool_pre_ping=True, # Validates connection before use
-                connect_args={"connect_timeout": 5}
-            )
-            _SessionLocal = sessionmaker(bind=_engine)
-        except Exception as e:
-            logger.error(f"Database engine initialization failed: {str(e)}")
-            raise
-    return _SessionLocal()
+# Short timeouts and no retries keep an unreachable Data API endpoint inside the function's
+# default 3s timeout, so the caller gets a 503 instead of a Lambda timeout
+rds_data = boto3.client('rds-data', config=Config(
+    connect_timeout=1,
+    read_timeout=1.5,
+    retries={"max_attempts": 0}
+))
+
+# [minute, (booking_date, booking_date_iso, hour)] for the slot last looked up by this container
+_LAST_MIN = [-1, None]
+
+def current_slot():
+    """Returns the booking date, its ISO string and the "%H:00" hour, recomputed at most once a minute."""
+    minute = int(time.time()) // 60
+    if minute != _LAST_MIN[0]:
+        today = datetime.datetime.now()
+        _LAST_MIN[:] = [minute, (today.date(), today.date().isoformat(), today.strftime("%H:00"))]
+    return _LAST_MIN[1]
 
 def send_return_status(status_code, data):
     """Utility to format the API Gateway response."""
@@ -56,45 +55,40 @@ def send_return_status(status_code, data):
             "Content-Type": "application/json",
             "Access-Control-Allow-Origin": "*"
         },
-        "body": json.dumps(data)
+        "body": orjson.dumps(data, default=str).decode("utf-8")
     }
 
 def lambda_handler(event, context):
     logger.info("Event received: %s", json.dumps(event))
     
-    session = None
     try:
-        session = get_session()
-        return get_play_ad(event, session)
-    except SQLAlchemyError as e:
+        return get_play_ad(event)
+    except (ClientError, BotoCoreError) as e:
+        # BotoCoreError covers EndpointConnectionError / ConnectTimeoutError / ReadTimeoutError
         logger.error(f"Database error: {str(e)}")
         return send_return_status(503, {"error": "Service temporarily unavailable"})
     except Exception as e:
         logger.exception(f"Unexpected system error: {str(e)}")
         return send_return_status(500, {"error": "Internal server error"})
-    finally:
-        if session:
-            session.close()
 
-def get_play_ad(event, session):
+def get_play_ad(event):
     try:
         now = datetime.datetime.now()
-        booking_date = now.date()
-        hour = now.strftime("%H:00")
-
-        # Database Query with targeted Exception handling
-        query = (
-            session.query(SlotBookingRequest.url)
-            .join(CalendarTimeRates, SlotBookingRequest.booking_date_id == CalendarTimeRates.id)
-            .filter(
-                CalendarTimeRates.booking_date == booking_date,
-                CalendarTimeRates.hour == hour,
-                SlotBookingRequest.approval_status == "approved"
-            )
-            .limit(1)
+        booking_date, booking_date_iso, hour = current_slot()
+
+        # Single HTTPS round trip; boto errors propagate to lambda_handler as a 503
+        result = rds_data.execute_statement(
+            resourceArn=DB_CLUSTER_ARN,
+            secretArn=DB_SECRET_ARN,
+            database=DB_NAME,
+            sql=PLAY_AD_SQL,
+            parameters=[
+                {"name": "booking_date", "value": {"stringValue": booking_date_iso}, "typeHint": "DATE"},
+                {"name": "hour", "value": {"stringValue": hour}}
+            ]
         )
-        
-        s3_key = query.scalar()
+        records = result.get("records") or []
+        s3_key = records[0][0].get("stringValue") if records else None
 
         if not s3_key:
             logger.warning(f"No approved content found for date: {booking_date} hour: {hour}")
@@ -113,7 +107,7 @@ def get_play_ad(event, session):
 
         return send_return_status(200, {
             "url": url, 
-            "timestamp": now.isoformat(),
+            "timestamp": now,
             "slot": hour
         })
 